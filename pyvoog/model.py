@@ -1,5 +1,8 @@
 import itertools
+import keyword
+import operator
 import types
+import weakref
 
 import sqlalchemy
 
@@ -20,28 +23,76 @@ from pyvoog.exceptions import ValidationError
 from pyvoog.util import Undefined
 from pyvoog.validatable import Validatable
 
+def _make_tuple_attrgetter(names):
+
+    """ As `operator.attrgetter`, but always return a tuple, even if zero or
+    one attribute names are passed.
+    """
+
+    if not names:
+        return lambda obj: ()
+    elif len(names) == 1:
+        getter = operator.attrgetter(names[0])
+        return lambda obj: (getter(obj),)
+
+    return operator.attrgetter(*names)
+
 class SchemaGenerator:
     skipped_fields = ["id"]
+    vattr_field_kwargs = {"allow_none": True}
+
+    _cache = weakref.WeakKeyDictionary()
 
     @classmethod
-    def generate_schema(cls, model):
+    def generate_schema(cls, model, refresh=False):
 
         """ Generate a skeleton Marshmallow schema by reflecting on an
         SQLAlchemy model. Include both columns and virtual attributes. Virtual
         attrs are `allow_none` as not to clash with field validation down the
-        pipeline.
+        pipeline. The schema is generated once per model and cached; models
+        are referenced weakly. Pass `refresh` to regenerate the schema, e.g.
+        after the mapping has changed.
         """
 
+        if refresh or (schema := cls._cache.get(model)) is None:
+            schema = cls._cache[model] = cls._build_schema(model)
+
+        return schema
+
+    @classmethod
+    def clear_cache(cls):
+        cls._cache.clear()
+
+    @classmethod
+    def _build_schema(cls, model):
         schema_dict = {}
 
-        for c in inspect(model).c:
+        for c in cls._get_columns(model):
             schema_dict.update(cls._get_column_schema(c))
 
         for vattr in cls._get_vattrs(model):
-            schema_dict[vattr.name] = fields.Field(allow_none=True)
+            schema_dict[vattr.name] = fields.Field(**cls.vattr_field_kwargs)
 
         return Schema.from_dict(schema_dict)
 
+    @staticmethod
+    def _make_string_field(_type, **field_kwargs):
+        validator = None
+
+        if _type.length is not None:
+            validator = validate.Length(max=_type.length)
+
+        return fields.Str(validate=validator, **field_kwargs)
+
+    # Map column types to field factories. A column type is resolved by
+    # walking its MRO, hence subclasses (e.g. Enum of String) are covered.
+
+    _field_factories = {
+        Boolean: lambda _type, **field_kwargs: fields.Boolean(**field_kwargs),
+        Integer: lambda _type, **field_kwargs: fields.Integer(**field_kwargs),
+        String: _make_string_field,
+    }
+
     @classmethod
     def _get_column_schema(cls, c):
         _type = c.type
@@ -55,24 +106,33 @@ class SchemaGenerator:
         elif not c.nullable:
             field_kwargs['required'] = True
 
-        if isinstance(_type, Boolean):
-            column_schema[c.name] = fields.Boolean(**field_kwargs)
-        elif isinstance(_type, Integer):
-            column_schema[c.name] = fields.Integer(**field_kwargs)
-        elif isinstance(_type, String):
-            validator = None
-
-            if _type.length is not None:
-                validator = validate.Length(max=_type.length)
-
-            column_schema[c.name] = fields.Str(validate=validator, **field_kwargs)
+        for t in type(_type).__mro__:
+            if factory := cls._field_factories.get(t):
+                column_schema[c.name] = factory(_type, **field_kwargs)
+                break
         else:
             column_schema[c.name] = fields.Field(**field_kwargs)
 
         return column_schema
 
+    @classmethod
+    def _get_columns(cls, model):
+
+        """ Return the columns cached by `Model.__declare_last__`, falling
+        back to reflection if these are not (yet) available on the model
+        itself.
+        """
+
+        if (columns := model.__dict__.get("_cached_columns")) is not None:
+            return columns
+
+        return inspect(model).c
+
     @classmethod
     def _get_vattrs(cls, model):
+        if (vattrs := model.__dict__.get("_vattrs_tuple")) is not None:
+            return vattrs
+
         return filter(
             lambda attr: isinstance(attr, VirtualAttribute),
             model.__dict__.values()
@@ -91,8 +151,8 @@ class VirtualAttribute(Validatable):
 
     """ Support virtual attributes, i.e. those not backed by a distinct
     database column on a model. These are routed to a JSON or TEXT field in
-    the model's table. The attribute name is automatically deduced by
-    ModelMetaClass.
+    the model's table. The attribute name is automatically deduced when the
+    attribute is assigned in the class body.
     """
 
     ALLOWED_PLAIN_DEFAULT_TYPES = (
@@ -122,7 +182,7 @@ class VirtualAttribute(Validatable):
 
         super().__init__()
 
-        if default != Undefined and not any(
+        if default is not Undefined and not any(
             isinstance(default, t) for t in self.ALLOWED_PLAIN_DEFAULT_TYPES
         ):
             raise TypeError(
@@ -139,15 +199,20 @@ class VirtualAttribute(Validatable):
         return self.attr_name
 
     def __get__(self, obj, objtype=None):
-        try:
-            return getattr(obj, self.schemaless_field)[self.attr_name]
-        except (KeyError, TypeError):
-            if self.default == Undefined:
-                raise
-            elif callable(self.default):
-                return self.default()
-            else:
-                return self.default
+        store = getattr(obj, self.schemaless_field)
+
+        if store is not None:
+            value = store.get(self.attr_name, Undefined)
+
+            if value is not Undefined:
+                return value
+
+        if self.default is Undefined:
+            raise KeyError(self.attr_name)
+        elif callable(self.default):
+            return self.default()
+
+        return self.default
 
     def __set__(self, obj, value):
         if obj.schemaless is None:
@@ -155,8 +220,8 @@ class VirtualAttribute(Validatable):
 
         obj.schemaless[self.attr_name] = value
 
-    def _set_attr_name(self, attr_name):
-        self.attr_name = attr_name
+    def __set_name__(self, owner, name):
+        self.attr_name = name
 
 class UTCTimeStamp(sa_types.TypeDecorator):
 
@@ -180,15 +245,19 @@ class UTCTimeStamp(sa_types.TypeDecorator):
 
     def process_bind_param(self, value: datetime, dialect):
         if value == self.NOW:
-            value = datetime.now(tz=timezone.utc).replace(microsecond=0)
+            return datetime.now(tz=timezone.utc).replace(microsecond=0)
         elif not isinstance(value, datetime) or not value.tzinfo:
             raise TypeError("UTCTimeStamp values must be aware `datetime` objects")
+        elif value.tzinfo is timezone.utc:
+            return value
 
         return value.astimezone(timezone.utc)
 
     def process_result_value(self, value, dialect):
         if value.tzinfo is None:
             return value.replace(tzinfo=timezone.utc)
+        elif value.tzinfo is timezone.utc:
+            return value
 
         return value.astimezone(timezone.utc)
 
@@ -199,19 +268,32 @@ class ModelMetaclass(DeclarativeMeta):
     def __init__(cls, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        cls._set_va_attr_names()
+        cls._default_scope_fn = getattr(cls, "default_scope", None)
+
+        cls._collect_vattrs()
         cls._declare_timestamps()
         cls._attach_init_listener()
 
-    def _set_va_attr_names(cls):
+    @property
+    def scoped_query(cls):
 
-        """ Attach attribute names to VirtualAttributes. """
+        """ A Select with the default scope applied, as returned by
+        `get_query`. Defined on the metaclass to be accessible on model
+        classes without chaining `classmethod` and `property`.
+        """
 
-        for k, v in cls.__dict__.items():
-            if k.startswith("_") or not isinstance(v, VirtualAttribute):
-                continue
+        return cls.get_query()
 
-            v._set_attr_name(k)
+    def _collect_vattrs(cls):
+
+        """ Collect the VirtualAttributes declared on the class into
+        `_vattrs_tuple`.
+        """
+
+        cls._vattrs_tuple = tuple(
+            v for k, v in cls.__dict__.items()
+            if not k.startswith("_") and isinstance(v, VirtualAttribute)
+        )
 
     def _declare_timestamps(cls):
         if not getattr(cls, "include_timestamps", False):
@@ -228,7 +310,7 @@ class ModelMetaclass(DeclarativeMeta):
         https://docs.sqlalchemy.org/en/20/orm/events.html#sqlalchemy.orm.InstanceEvents.init
         """
 
-        if hasattr(cls, "default_scope"):
+        if cls._default_scope_fn:
             listen(cls, "init", cls._apply_default_scope)
 
 class Model:
@@ -245,8 +327,8 @@ class Model:
     - Default scopes. If a model class has the `default_scope` attribute
       defined, it is expected to be a callable returning a dict of keyword
       attributes to pass to SQLAlchemy's `filter_by`. A statement with the
-      scope applied can be retrieved via the `get_scoped_query` method or
-      the `scoped_query` property.
+      scope applied can be retrieved via the `get_query` method or the
+      `scoped_query` class property.
 
     Model attributes may either have a 1:1 mapping to database columns
     (`sqlalchemy.Column` or its subclasses) or be VirtualAttributes which
@@ -267,26 +349,49 @@ class Model:
 
     @classmethod
     def __declare_last__(cls):
-        cls.__schema__ = SchemaGenerator.generate_schema(cls)
+
+        """ Generate the Marshmallow schema once the mapping is complete. A
+        single schema instance and its fields are cached on the class, as
+        instantiating a Schema is expensive and validation or serialization
+        never mutates it. SQLAlchemy may invoke this again on subsequent
+        mapper configuration, hence the schema is always regenerated.
+        """
+
+        cls._cache_attributes()
+        cls.__schema__ = SchemaGenerator.generate_schema(cls, refresh=True)
+        cls.__schema_instance__ = cls.__schema__()
+        cls.__schema_fields__ = cls.__schema_instance__.fields
+        cls._validate_fn = cls.__schema_instance__.validate
+        cls._schema_attr_names = tuple(cls.__schema_fields__.keys())
+        cls._schema_attrgetter = _make_tuple_attrgetter(cls._schema_attr_names)
+        cls._compile_attr_dict_methods()
 
     @classmethod
-    def get_unscoped_query(cls, *args):
+    def get_unscoped_query(cls, *args, only=None):
 
         """ Return an unscoped Select. If any arguments are passed, these are
         forwarded to `select` and the table is explicitly specified via
         `select_from`.
+
+        `only` may be passed as an iterable of attribute names to select
+        only the corresponding columns (after any positional arguments).
+        Note that executing a pruned query yields Core Rows instead of
+        model instances, skipping ORM hydration.
         """
 
+        if only:
+            args = (*args, *(getattr(cls, name) for name in only))
+
         return select(*args).select_from(cls) if args else select(cls)
 
     @classmethod
-    def get_query(cls, *args):
+    def get_query(cls, *args, only=None):
 
         """ Return a Select with any default scope defined by the model
         applied. Arguments are forwarded to `get_unscoped_query`.
         """
 
-        return cls._apply_default_scope_to_stmt(cls.get_unscoped_query(*args))
+        return cls._apply_default_scope_to_stmt(cls.get_unscoped_query(*args, only=only))
 
     @classmethod
     def get_unscoped_statement(cls, verb, *args):
@@ -307,13 +412,48 @@ class Model:
 
         return cls._apply_default_scope_to_stmt(cls.get_unscoped_statement(verb, *args))
 
+    @classmethod
+    def iter_ids(cls, session=None, chunk_size=10_000):
+
+        """ Yield the ids of all records within the default scope. A fast path
+        for bulk operations: the scoped query is compiled once and executed
+        via `exec_driver_sql`, and rows are fetched in chunks of
+        `chunk_size` directly from the DB-API cursor, bypassing SQLAlchemy's
+        result processing. Scope values are passed to the driver as-is,
+        i.e. no type-level bind processing is performed.
+
+        The session defaults to the per-request session.
+        """
+
+        connection = (session or get_session()).connection()
+        compiled = cls.get_query(cls.id).compile(dialect=connection.dialect)
+        params = compiled.params
+
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+
+        result = connection.exec_driver_sql(str(compiled), params)
+
+        try:
+            while rows := result.cursor.fetchmany(chunk_size):
+                for (id_,) in rows:
+                    yield id_
+        finally:
+            result.close()
+
     def validate(self):
-        schema = self.__class__.__schema__()
         attrs = self._get_attr_dict()
-        errors = schema.validate(attrs)
+        errors = self.__class__._validate_fn(attrs)
 
         for (attr_name, messages) in self._run_attr_validations():
-            always_merger.merge(errors, {attr_name: messages})
+            existing = errors.get(attr_name)
+
+            if existing is None:
+                errors[attr_name] = messages
+            elif isinstance(existing, list) and isinstance(messages, list):
+                existing.extend(messages)
+            else:
+                errors[attr_name] = always_merger.merge(existing, messages)
 
         if errors:
             raise ValidationError(errors, None, attrs)
@@ -346,9 +486,69 @@ class Model:
         for k, v in attrs.items():
             setattr(self, k, v)
 
+    @classmethod
+    def _cache_attributes(cls):
+
+        """ Cache the mapped columns of the class and the subset of columns
+        and VirtualAttributes which are Validatable to avoid repeated
+        reflection on validation. Run once the mapping is complete, as
+        columns may be attached after the class body.
+        """
+
+        cls._cached_columns = tuple(inspect(cls).c)
+        cls._validatables = tuple(
+            attr for attr in itertools.chain(cls._cached_columns, cls._vattrs_tuple)
+            if isinstance(attr, Validatable)
+        )
+
+    @classmethod
+    def _compile_attr_dict_methods(cls):
+
+        """ Replace `_get_attr_dict` and `as_dict` with functions generated
+        for the concrete set of schema fields, building the dict as a
+        literal. Methods overridden by a subclass are left alone. As the
+        generic `as_dict` delegates to `_get_attr_dict`, it is not generated
+        if the latter is overridden. If any field name is not a valid
+        identifier, the generic implementations are used. In either case, a
+        generated method inherited from a parent model is reset to the
+        generic implementation.
+        """
+
+        names = cls._schema_attr_names
+        compilable = all(n.isidentifier() and not keyword.iskeyword(n) for n in names)
+        overridden = {
+            method_name: (
+                (current := getattr(cls, method_name)) is not getattr(Model, method_name)
+                and not getattr(current, "_generated", False)
+            )
+            for method_name in ("_get_attr_dict", "as_dict")
+        }
+
+        for method_name, attr_names, generate in (
+            ("_get_attr_dict", names, compilable),
+            ("as_dict", ("id", *names), compilable and not overridden["_get_attr_dict"]),
+        ):
+            if overridden[method_name]:
+                continue
+            elif not generate:
+                setattr(cls, method_name, getattr(Model, method_name))
+                continue
+
+            items = ", ".join(f"{n!r}: self.{n}" for n in attr_names)
+            src = f"def {method_name}(self):\n    return {{{items}}}\n"
+            namespace = {}
+
+            exec(compile(src, f"<{cls.__name__}.{method_name}>", "exec"), namespace)
+
+            fn = namespace[method_name]
+            fn.__qualname__ = f"{cls.__qualname__}.{method_name}"
+            fn._generated = True
+
+            setattr(cls, method_name, fn)
+
     @classmethod
     def _apply_default_scope_to_stmt(cls, stmt):
-        scope = getattr(cls, "default_scope", None)
+        scope = cls._default_scope_fn
 
         if scope:
             stmt = stmt.filter_by(**scope())
@@ -356,30 +556,23 @@ class Model:
         return stmt
 
     def _run_attr_validations(self):
-        columns = inspect(self.__class__).c
-        vattrs = self._get_vattrs()
-
-        for c in itertools.chain(columns, vattrs):
-            if isinstance(c, Validatable):
-                try:
-                    c.is_valid(self)
-                except ValidationError as e:
-                    yield (c.name, e.messages)
+        for attr in self.__class__._validatables:
+            try:
+                attr.is_valid(self)
+            except ValidationError as e:
+                yield (attr.name, e.messages)
 
     def _get_vattrs(self):
-        return filter(
-            lambda attr: isinstance(attr, VirtualAttribute),
-            self.__class__.__dict__.values()
-        )
+        return self.__class__._vattrs_tuple
 
     def _get_attr_dict(self):
-        schema_fields = self.__class__.__schema__().fields
-        return {k: getattr(self, k) for k, v in schema_fields.items()}
+        names = self.__class__._schema_attr_names
+        return dict(zip(names, self.__class__._schema_attrgetter(self)))
 
     def _apply_default_scope(self, args, kwargs):
-        scope = getattr(self, "default_scope", None)
+        scope = self.__class__._default_scope_fn
 
         if scope:
-            kwargs |= scope.__func__()
+            kwargs |= scope()
 
 Model = declarative_base(cls=Model, metaclass=ModelMetaclass)
@@ -7,10 +7,15 @@ class Endpoint:
     mapping to a controller action on a Resource.
     """
 
-    def __init__(self, path, action, methods=["GET"]):
+    __slots__ = ("path", "action", "methods")
+
+    def __init__(self, path, action, methods=("GET",)):
+        if isinstance(methods, str):
+            raise TypeError("Endpoint methods must be an iterable of HTTP verbs, not a string")
+
         self.path = path
         self.action = action
-        self.methods = methods
+        self.methods = tuple(methods)
 
     def __repr__(self):
         return make_repr(self)
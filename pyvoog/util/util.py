@@ -63,9 +63,15 @@ def make_namespace_importer(module_template, subclass_of, return_class=False):
 def make_repr(obj):
 
     """ Generate an informative repr for `obj`. Consider using attrs, as it
-    provides a nice repr as a bonus.
+    provides a nice repr as a bonus. Objects without a `__dict__` are
+    described by their `__slots__`.
     """
 
-    attrs = ", ".join(f"{k}={v}" for k, v in vars(obj).items())
+    if hasattr(obj, "__dict__"):
+        items = vars(obj).items()
+    else:
+        items = ((k, getattr(obj, k)) for k in type(obj).__slots__)
+
+    attrs = ", ".join(f"{k}={v}" for k, v in items)
 
     return f"<{type(obj).__name__}({attrs})>"